@@ -2,8 +2,14 @@ import csv
 import json
 import xml.etree.ElementTree as ET
 import os
+import sys
 import re
 import hashlib
+import pickle
+import shutil
+import zlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple, Any
 
@@ -26,6 +32,28 @@ POLICIES_JSON = os.path.join(DATA_DIR, 'insurance_policy_data.json')
 VEHICLES_CSV = os.path.join(DATA_DIR, 'vehicle_data.csv')
 EXTRAS_TXT = os.path.join(DATA_DIR, 'flagged_data.txt')
 
+# Checkpoint paths (resumable runs)
+CHECKPOINT_DIR = '.etl_checkpoint'
+EXTRACTED_CKPT = os.path.join(CHECKPOINT_DIR, 'extracted.pkl')
+UNIFIED_CKPT = os.path.join(CHECKPOINT_DIR, 'unified.pkl')
+LOAD_PROGRESS_CKPT = os.path.join(CHECKPOINT_DIR, 'load_progress.json')
+LOAD_BATCH_SIZE = 500
+
+def _env_workers(name: str, default: int) -> int:
+    raw = os.environ.get(name, "").strip()
+    if not raw:
+        return default
+    try:
+        return max(1, int(raw))
+    except ValueError:
+        print(f"⚠  Ignoring {name}={raw!r} (not an integer); using 1 worker")
+        return 1
+
+# Parallel notes scan: worker count (ETL_UNIFY_WORKERS overrides) and the
+# number of customer names below which the scan stays serial
+UNIFY_WORKERS = _env_workers("ETL_UNIFY_WORKERS", os.cpu_count() or 1)
+NOTES_PARALLEL_MIN_NAMES = 5000
+
 db = Database()
 
 def test_connection() -> bool:
@@ -380,7 +408,50 @@ def read_extras_txt(path: str) -> List[str]:
 # 5) TRANSFORMATION & UNIFICATION
 # =====================================================
 
-def unify_records(customers: List[Dict], vehicles: List[Dict], policies: List[Dict], extras_lines: Optional[List[str]] = None) -> Dict[int, Dict]:
+def _scan_notes(names: List[str], norm_lines: List[str]) -> List[Tuple[int, int]]:
+    """(line_idx, name_idx) for every full name found in a normalized notes line, in scan order."""
+    patterns = [re.compile(rf"\b{re.escape(n)}\b") for n in names]
+    return [(li, ni) for li, ln in enumerate(norm_lines) for ni, pat in enumerate(patterns) if pat.search(ln)]
+
+def _partition_of(full_key: str, n_partitions: int) -> int:
+    # crc32 rather than hash(): str hashing is salted per process
+    return zlib.crc32(full_key.encode("utf-8")) % n_partitions
+
+def _fork_available() -> bool:
+    # spawn would re-run the import-time table discovery per worker; fork after db.bind() is unsafe on macOS
+    return sys.platform.startswith("linux") and "fork" in multiprocessing.get_all_start_methods()
+
+# (names, norm_lines, name indexes per partition); set just before the pool forks so workers inherit it
+_NOTES_SCAN: Tuple[List[str], List[str], List[List[int]]] = ([], [], [])
+
+def _scan_notes_partition(i: int) -> List[Tuple[int, int]]:
+    names, norm_lines, parts = _NOTES_SCAN
+    idxs = parts[i]
+    return [(li, idxs[k]) for li, k in _scan_notes([names[g] for g in idxs], norm_lines)]
+
+def _scan_notes_parallel(names: List[str], norm_lines: List[str], workers: int) -> Optional[List[Tuple[int, int]]]:
+    """_scan_notes with names hash-partitioned by full-name key over forked workers; None means scan serially."""
+    global _NOTES_SCAN
+    if not _fork_available():
+        print("   ℹ️  Parallel notes scan needs fork (Linux); scanning serially")
+        return None
+
+    parts: List[List[int]] = [[] for _ in range(workers)]
+    for g, name in enumerate(names):
+        parts[_partition_of(name, workers)].append(g)
+
+    _NOTES_SCAN = (names, norm_lines, parts)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork")) as pool:
+            results = list(pool.map(_scan_notes_partition, range(workers)))
+    except Exception as e:
+        print(f"   ⚠  Parallel notes scan failed ({e!r}); scanning serially")
+        return None
+    finally:
+        _NOTES_SCAN = ([], [], [])
+    return sorted(m for r in results for m in r)
+
+def unify_records(customers: List[Dict], vehicles: List[Dict], policies: List[Dict], extras_lines: Optional[List[str]] = None, workers: int = 1) -> Dict[int, Dict]:
     """
     Build a unified map {customer_id: {customer fields..., vehicles:[], policies:[], notes:[]}}
     """
@@ -487,16 +558,20 @@ def unify_records(customers: List[Dict], vehicles: List[Dict], policies: List[Di
             if full:
                 name_to_ids.setdefault(full, []).append(cid)
 
-        for line in extras_lines:
-            attached = False
-            ln = _norm_name(line)
-            for full_name, ids in name_to_ids.items():
-                if re.search(rf"\b{re.escape(full_name)}\b", ln):
-                    for cid in ids:
-                        unified[cid]["notes"].append(line)
-                    attached = True
-            if not attached:
-                unmatched_notes += 1
+        names = list(name_to_ids)
+        norm_lines = [_norm_name(line) for line in extras_lines]
+        matches = None
+        if workers > 1 and len(names) >= NOTES_PARALLEL_MIN_NAMES:
+            matches = _scan_notes_parallel(names, norm_lines, workers)
+        if matches is None:
+            matches = _scan_notes(names, norm_lines)
+
+        attached = set()
+        for line_idx, name_idx in matches:
+            for cid in name_to_ids[names[name_idx]]:
+                unified[cid]["notes"].append(extras_lines[line_idx])
+            attached.add(line_idx)
+        unmatched_notes = len(extras_lines) - len(attached)
 
     if unmatched_notes:
         print(f"   ℹ️  Notes lines not attached to any customer: {unmatched_notes}")
@@ -504,7 +579,89 @@ def unify_records(customers: List[Dict], vehicles: List[Dict], policies: List[Di
     return unified
 
 # =====================================================
-# 6) LOAD INTO DATABASE
+# 6) CHECKPOINTING
+# =====================================================
+
+def _inputs_fingerprint() -> List[Tuple[str, Optional[int], Optional[int]]]:
+    """(path, size, mtime_ns) per input file; a checkpoint is only reused while this matches."""
+    fp = []
+    for path in (CUSTOMERS_XML, POLICIES_JSON, VEHICLES_CSV, EXTRAS_TXT):
+        try:
+            st = os.stat(path)
+            fp.append((path, st.st_size, st.st_mtime_ns))
+        except OSError:
+            fp.append((path, None, None))
+    return fp
+
+def _atomic_write(path: str, payload: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def save_checkpoint(path: str, data: Any, fingerprint: List[Tuple[str, Optional[int], Optional[int]]]):
+    payload = {"fingerprint": fingerprint, "data": data}
+    _atomic_write(path, pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL))
+
+def load_checkpoint(path: str, fingerprint: List[Tuple[str, Optional[int], Optional[int]]]) -> Optional[Any]:
+    """Return checkpointed data, or None if missing, unreadable or built from different input files."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            payload = pickle.load(f)
+    except Exception as e:
+        print(f"   ⚠  Ignoring unreadable checkpoint {path}: {e}")
+        return None
+    if not isinstance(payload, dict):
+        print(f"   ⚠  Ignoring malformed checkpoint {path}")
+        return None
+    if payload.get("fingerprint") != fingerprint:
+        print(f"   ℹ️  Input files changed since checkpoint {path}; rebuilding.")
+        return None
+    return payload.get("data")
+
+def _load_target() -> List[str]:
+    return [DB_HOST, DB_NAME, CUSTOMER_TABLE_NAME]
+
+def _unified_digest(unified: Dict[int, Dict]) -> str:
+    """Content digest of the rows being loaded, in load order; load progress is keyed on it."""
+    return hashlib.sha256(repr(list(unified.items())).encode("utf-8")).hexdigest()
+
+def _load_committed_batch(digest: str) -> int:
+    """Index of the last load batch committed for these rows and target table, or -1 if none."""
+    if not os.path.exists(LOAD_PROGRESS_CKPT):
+        return -1
+    try:
+        with open(LOAD_PROGRESS_CKPT, "r", encoding="utf-8") as f:
+            progress = json.load(f)
+    except Exception:
+        return -1
+    if not isinstance(progress, dict):
+        return -1
+    if (progress.get("digest") != digest
+            or progress.get("batch_size") != LOAD_BATCH_SIZE
+            or progress.get("target") != _load_target()):
+        return -1
+    return int(progress.get("last_batch", -1))
+
+def _record_committed_batch(batch_idx: int, digest: str):
+    progress = {
+        "digest": digest,
+        "batch_size": LOAD_BATCH_SIZE,
+        "target": _load_target(),
+        "last_batch": batch_idx,
+    }
+    _atomic_write(LOAD_PROGRESS_CKPT, json.dumps(progress).encode("utf-8"))
+
+def clear_checkpoints():
+    shutil.rmtree(CHECKPOINT_DIR, ignore_errors=True)
+
+# =====================================================
+# 7) LOAD INTO DATABASE
 # =====================================================
 
 def _fallback_agent_code():
@@ -520,7 +677,15 @@ def _fallback_agent_code():
     except Exception:
         return None
 
-def load_to_db(unified_dict: Dict[int, Dict]):
+def load_to_db(unified_dict: Dict[int, Dict], start_batch: int = 0, digest: str = ""):
+    """Upsert customers in committed batches from start_batch on (at-least-once on resume)."""
+    items = list(unified_dict.items())
+    total_batches = (len(items) + LOAD_BATCH_SIZE - 1) // LOAD_BATCH_SIZE
+    start = start_batch * LOAD_BATCH_SIZE
+    if start_batch and start >= len(items):
+        print(f"   ℹ️  All {len(items)} customers were already loaded by a previous run.")
+        return
+
     cols_meta = {c["Field"]: c for c in CUSTOMER_COLS}
     cols_set = set(cols_meta.keys())
     required = _required_cols(CUSTOMER_COLS) - {PK_COL}
@@ -543,9 +708,15 @@ def load_to_db(unified_dict: Dict[int, Dict]):
 
     fallback_agent = _fallback_agent_code()
 
-    with pymysql.connect(host=DB_HOST, user=DB_USER, password=DB_PASSWORD, database=DB_NAME, autocommit=True) as conn:
+    record_progress = True
+    if start_batch:
+        print(f"   ↪️  Resuming load at batch {start_batch + 1}/{total_batches}")
+        if _PK_AUTO:
+            print("   ⚠  Auto-increment key: a batch committed just before the last failure may be inserted twice")
+
+    with pymysql.connect(host=DB_HOST, user=DB_USER, password=DB_PASSWORD, database=DB_NAME, autocommit=False) as conn:
         with conn.cursor() as cur:
-            for cid, data in unified_dict.items():
+            for i, (cid, data) in enumerate(items[start:], start=start):
                 row = {}
 
                 if not _PK_AUTO:
@@ -613,10 +784,19 @@ def load_to_db(unified_dict: Dict[int, Dict]):
                     sql += f" ON DUPLICATE KEY UPDATE {update_list}"
                 cur.execute(sql, insert_vals)
 
-    print(f"✅ Loaded/updated {len(unified_dict)} customers into {CUSTOMER_TABLE_NAME}.")
+                if (i + 1) % LOAD_BATCH_SIZE == 0 or i + 1 == len(items):
+                    conn.commit()
+                    if record_progress:
+                        try:
+                            _record_committed_batch(i // LOAD_BATCH_SIZE, digest)
+                        except Exception as e:
+                            print(f"   ⚠  Could not write load progress checkpoint: {e}")
+                            record_progress = False
+
+    print(f"✅ Loaded/updated {len(items) - start} customers into {CUSTOMER_TABLE_NAME}.")
 
 # =====================================================
-# 7) DISPLAY RESULTS
+# 8) DISPLAY RESULTS
 # =====================================================
 
 def display_results():
@@ -635,7 +815,7 @@ def display_results():
                 print(f" - {line}")
 
 # =====================================================
-# 8) MAIN
+# 9) MAIN
 # =====================================================
 
 def main():
@@ -657,25 +837,47 @@ def main():
         return
 
     print("\n3️⃣ Extracting data from files...")
-    try:
-        customers = read_customers_xml(CUSTOMERS_XML)
-        vehicles = read_vehicles_csv(VEHICLES_CSV)
-        policies = read_policies_json(POLICIES_JSON)
-        extras = read_extras_txt(EXTRAS_TXT)
-    except Exception as e:
-        print(f"❌ Failed to extract data: {e}")
-        return
+    fingerprint = _inputs_fingerprint()
+    unified = load_checkpoint(UNIFIED_CKPT, fingerprint)
+    if unified is not None:
+        print("   ↪️  Resuming from unified checkpoint; skipping extraction")
+    else:
+        extracted = load_checkpoint(EXTRACTED_CKPT, fingerprint)
+        if extracted is not None:
+            customers, vehicles, policies, extras = extracted
+            print("   ↪️  Resuming from extraction checkpoint")
+        else:
+            try:
+                customers = read_customers_xml(CUSTOMERS_XML)
+                vehicles = read_vehicles_csv(VEHICLES_CSV)
+                policies = read_policies_json(POLICIES_JSON)
+                extras = read_extras_txt(EXTRAS_TXT)
+            except Exception as e:
+                print(f"❌ Failed to extract data: {e}")
+                return
+            try:
+                save_checkpoint(EXTRACTED_CKPT, (customers, vehicles, policies, extras), fingerprint)
+            except Exception as e:
+                print(f"   ⚠  Could not write extraction checkpoint: {e}")
 
     print("\n4️⃣ Transforming and unifying data...")
-    unified = unify_records(customers, vehicles, policies, extras)
+    if unified is None:
+        unified = unify_records(customers, vehicles, policies, extras, workers=UNIFY_WORKERS)
+        try:
+            save_checkpoint(UNIFIED_CKPT, unified, fingerprint)
+        except Exception as e:
+            print(f"   ⚠  Could not write unify checkpoint: {e}")
     print(f"   ✅ Unified {len(unified)} customer records")
 
     print("\n5️⃣ Loading data into database...")
     try:
-        load_to_db(unified)
+        digest = _unified_digest(unified)
+        load_to_db(unified, start_batch=_load_committed_batch(digest) + 1, digest=digest)
     except Exception as e:
         print(f"❌ Failed to load data: {e}")
+        print(f"   ℹ️  Progress saved in {CHECKPOINT_DIR}/; rerun to resume from the last committed batch.")
         return
+    clear_checkpoints()
 
     print("\n6️⃣ Displaying results...")
     try:
@@ -0,0 +1,159 @@
+import importlib
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+pytest.importorskip("pymysql")
+pytest.importorskip("pony.orm")
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+
+class _FakeCursor:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, args=None):
+        self.sql = sql
+
+    def fetchall(self):
+        if self.sql == "SHOW TABLES":
+            return [("CARINSUR_CUSTOMER",)]
+        return [("CUST_CODE", "int", "NO", "PRI", None, "")]
+
+
+class _FakeConnection(_FakeCursor):
+    def cursor(self):
+        return _FakeCursor()
+
+
+@pytest.fixture(scope="module")
+def etl():
+    # main.py discovers the customer table against MySQL at import time
+    with mock.patch("pymysql.connect", lambda **kwargs: _FakeConnection()):
+        sys.modules.pop("main", None)
+        return importlib.import_module("main")
+
+
+@pytest.fixture
+def force_parallel(etl, monkeypatch):
+    monkeypatch.setattr(etl, "NOTES_PARALLEL_MIN_NAMES", 0)
+    if not etl._fork_available():
+        pytest.skip("parallel notes scan needs fork")
+
+
+def _synthetic(etl):
+    firsts = ["nicole", "tina", "georgina", "james", "emma", "lewis", "rebecca", "nathan"]
+    lasts = ["fuller", "bishop", "harris", "evans", "roberts", "palmer"]
+    customers = []
+    for i, (first, last) in enumerate((f, l) for f in firsts for l in lasts):
+        for pc in ([f"AB{i % 7} 1CD", f"ZX{i % 5} 9QR"] if i % 9 == 0 else [f"AB{i % 7} 1CD"]):
+            customers.append({
+                "id": etl._deterministic_id_within_range(first, last, pc),
+                "first_name": first, "last_name": last, "marital_status": None,
+                "salary": float(i), "address": pc, "address_postcode": pc,
+            })
+
+    vehicles = []
+    for i, c in enumerate(customers):
+        pc = c["address_postcode"] if i % 3 == 0 else ("" if i % 3 == 1 else "NO MATCH")
+        vehicles.append({"model": f"Model {i}", "year": 2000 + i % 20, "customer_id": None,
+                         "first_name": c["first_name"], "last_name": c["last_name"], "postcode": pc})
+    vehicles.append({"model": "Orphan", "year": None, "customer_id": None, "first_name": "zara", "last_name": "quinn", "postcode": ""})
+    vehicles.append({"model": "Half", "year": None, "customer_id": None, "first_name": "tina", "last_name": "", "postcode": ""})
+
+    unknown = [("zara", "quinn"), ("omar", "patel"), ("lucy", "ng"), ("ben", "okafor")]
+    policies = []
+    for i in range(60):
+        if i % 4 == 0:
+            first, last = unknown[(i // 4) % len(unknown)]
+            pc = f"PL{i % 3} 2EF"
+        else:
+            c = customers[(i * 7) % len(customers)]
+            first, last, pc = c["first_name"], c["last_name"], (c["address_postcode"] if i % 2 else "")
+        policies.append({
+            "customer_lookup": (first, last, pc.upper()),
+            "start_date": datetime(2024, 1 + i % 12, 1), "end_date": datetime(2025, 1 + i % 12, 1),
+            "monthly_payment": float(10 + i), "payment_frequency": "Monthly",
+        })
+
+    extras = [
+        "Happy Birthday Ms Tina Bishop! Our latest offers are waiting.",
+        "Nathan Palmer and Emma Harris asked about multi-car cover.",
+        "Zara Quinn called about her renewal.",
+        "Nobody in particular is mentioned here.",
+        "Reminder for lewis evans, lewis evans again, and Omar Patel.",
+    ]
+    return customers, vehicles, policies, extras
+
+
+def test_notes_attach_to_every_named_customer(etl, capsys):
+    customers, vehicles, policies, extras = _synthetic(etl)
+    unified = etl.unify_records(customers, vehicles, policies, extras)
+
+    by_name = {}
+    for c in unified.values():
+        by_name.setdefault((c["first_name"], c["last_name"]), []).append(c)
+    assert [c["notes"] for c in by_name[("tina", "bishop")]] == [[extras[0]]]
+    assert by_name[("nathan", "palmer")][0]["notes"] == [extras[1]]
+    assert by_name[("emma", "harris")][0]["notes"] == [extras[1]]
+    # policy-only placeholders get notes too
+    assert by_name[("zara", "quinn")][0]["notes"] == [extras[2]]
+    assert by_name[("omar", "patel")][0]["notes"] == [extras[4]]
+    assert "Notes lines not attached to any customer: 1" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("workers", [2, 3, 5])
+def test_parallel_notes_scan_matches_serial(etl, force_parallel, capsys, workers):
+    data = _synthetic(etl)
+    expected = list(etl.unify_records(*data).items())
+    expected_out = capsys.readouterr().out
+
+    got = list(etl.unify_records(*data, workers=workers).items())
+    assert got == expected
+    assert capsys.readouterr().out == expected_out
+
+
+def test_parallel_notes_scan_matches_serial_on_shipped_data(etl, force_parallel, monkeypatch, capsys):
+    monkeypatch.chdir(REPO_ROOT)
+    data = (
+        etl.read_customers_xml(etl.CUSTOMERS_XML),
+        etl.read_vehicles_csv(etl.VEHICLES_CSV),
+        etl.read_policies_json(etl.POLICIES_JSON),
+        etl.read_extras_txt(etl.EXTRAS_TXT),
+    )
+    capsys.readouterr()
+    expected = list(etl.unify_records(*data).items())
+    expected_out = capsys.readouterr().out
+
+    assert list(etl.unify_records(*data, workers=4).items()) == expected
+    assert capsys.readouterr().out == expected_out
+
+
+def test_pool_failure_falls_back_to_serial(etl, force_parallel, monkeypatch, capsys):
+    data = _synthetic(etl)
+    expected = list(etl.unify_records(*data).items())
+    capsys.readouterr()
+
+    monkeypatch.setattr(etl, "_scan_notes_partition", lambda i: os._exit(3))
+    assert list(etl.unify_records(*data, workers=3).items()) == expected
+    assert "Parallel notes scan failed" in capsys.readouterr().out
+
+
+def test_small_inputs_stay_serial(etl, monkeypatch):
+    monkeypatch.setattr(etl, "_scan_notes_parallel", mock.Mock(side_effect=AssertionError("pool started")))
+    etl.unify_records(*_synthetic(etl), workers=4)
+
+
+@pytest.mark.parametrize("raw, expected", [("", 6), ("3", 3), ("0", 1), ("auto", 1)])
+def test_env_workers(etl, monkeypatch, raw, expected):
+    monkeypatch.setenv("ETL_UNIFY_WORKERS", raw)
+    assert etl._env_workers("ETL_UNIFY_WORKERS", 6) == expected